@@ -1,7 +1,7 @@
 import discord
 from discord.ext import commands, tasks
 from datetime import datetime, timedelta
-from motor.motor_asyncio import AsyncIOMotorClient
+from db import get_motor_client
 from dotenv import load_dotenv
 import os
 
@@ -26,7 +26,7 @@ class AFK(commands.Cog):
             if not self.mongo_uri:
                 raise ValueError("MongoDB URI not found. Ensure MONGO_URL is set in your .env file.")
 
-            self.db_client = AsyncIOMotorClient(self.mongo_uri, serverSelectionTimeoutMS=5000)
+            self.db_client = get_motor_client()
             # Test the connection
             await self.db_client.server_info()
             self.db = self.db_client[self.database_name]
@@ -201,10 +201,8 @@ class AFK(commands.Cog):
             del self._cache[key]
 
     async def cog_unload(self):
-        """Close the MongoDB client and clean up tasks."""
+        """Clean up tasks (the shared MongoDB client is closed on bot shutdown)."""
         try:
-            if self.db_client:
-                self.db_client.close()
             self.clean_cache.cancel()
         except Exception as e:
             print(f"Error during cog unload: {e}")
@@ -8,7 +8,7 @@ import asyncio
 from typing import Optional, List, Dict
 import pytz
 import os
-from motor.motor_asyncio import AsyncIOMotorClient
+from db import get_motor_client
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -24,8 +24,8 @@ CLEANUP_INTERVAL = 60
 class DatabaseManager:
     """Manages MongoDB interactions."""
 
-    def __init__(self, mongo_uri: str, database_name: str):
-        self.client = AsyncIOMotorClient(mongo_uri)
+    def __init__(self, database_name: str):
+        self.client = get_motor_client()
         self.db = self.client[database_name]
         self.giveaways_collection = self.db['giveaways']
         self.participants_collection = self.db['participants']
@@ -38,7 +38,6 @@ class DatabaseManager:
 class Giveaway(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        mongo_uri = os.getenv('MONGO_URL')
         database_name = os.getenv('MONGO_DATABASE', 'giveaway_bot')
 
         # Configure logging
@@ -49,7 +48,7 @@ class Giveaway(commands.Cog):
         self.logger.addHandler(handler)
         self.logger.setLevel(logging.WARNING)
 
-        self.db = DatabaseManager(mongo_uri, database_name)
+        self.db = DatabaseManager(database_name)
         self._checking = False
         self._ready = asyncio.Event()
         self.check_giveaways.start()
@@ -1,10 +1,17 @@
+import asyncio
+import copy
 import discord
 import logging
 import os
 import json
-from discord.ext import commands
+from contextlib import asynccontextmanager, contextmanager
+from discord.ext import commands, tasks
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library encoder
+    orjson = None
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Enhanced color palette
@@ -14,11 +21,113 @@ ERROR_COLOR = 0xe74c3c
 INFO_COLOR = 0x3498db
 WARNING_COLOR = 0xf39c12
 
+# Admin command fields shown by rolehelp
+ROLE_HELP_FIELDS = (
+    (".setlogchannel [@channel]", "Set log channel for bot activities"),
+    (".reqrole [@role]", "Set required role for role management"),
+    (".setrole [name] [@role]", "Map a custom role name"),
+    (".reset_role", "Reset role mappings"),
+)
+
+# Seconds between background flushes of changed configs to disk
+FLUSH_INTERVAL = 1
+# Set MAKIMA_PRETTY_JSON=1 to write indented configs for debugging
+PRETTY_JSON = os.getenv('MAKIMA_PRETTY_JSON') == '1'
+
+def dump_config(config):
+    """Serialize a server configuration to JSON bytes (role id sets become sorted lists)."""
+    if orjson is not None:
+        return orjson.dumps(config, default=sorted, option=orjson.OPT_INDENT_2 if PRETTY_JSON else 0)
+    if PRETTY_JSON:
+        return json.dumps(config, indent=4, default=sorted).encode()
+    return json.dumps(config, separators=(',', ':'), default=sorted).encode()
+
+def load_config(data):
+    """Parse a server configuration from JSON bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+class ResetRoleView(discord.ui.View):
+    """Dropdown for removing one role mapping, or all of them."""
+    def __init__(self, ctx, cog, config):
+        super().__init__()
+        self.ctx = ctx
+        self.cog = cog
+        self.config = config
+        role_mappings = config['role_mappings']
+
+        # Populate dropdown with role mapping options
+        self.select_menu.options = [
+            discord.SelectOption(
+                label=name, 
+                description=f"Reset mapping for '{name}'"
+            ) for name in role_mappings.keys()
+        ]
+        
+        # Add "Reset All" option
+        self.select_menu.options.append(
+            discord.SelectOption(
+                label="Reset All Mappings", 
+                description="Reset ALL role mappings", 
+                value="_reset_all"
+            )
+        )
+
+    @discord.ui.select(placeholder="Select Role Mapping to Reset")
+    async def select_menu(self, interaction: discord.Interaction, select: discord.ui.Select):
+        selected = select.values[0]
+        
+        if selected == "_reset_all":
+            # Reset all mappings
+            self.config['role_mappings'] = {}
+            self.cog.save_configs(self.ctx.guild.id, self.config)
+            
+            embed = self.cog._success_embed('all_mappings_reset', "All role mappings have been cleared.")
+            await interaction.response.send_message(embed=embed)
+            
+            await self.cog.log_activity(
+                self.ctx.guild, 
+                "Role Mapping Reset", 
+                "All role mappings cleared",
+                self.config.get('log_channel_id')
+            )
+        else:
+            # Reset specific mapping
+            self.config['role_mappings'].pop(selected, None)
+            self.cog.save_configs(self.ctx.guild.id, self.config)
+            
+            embed = self.cog._success_embed('mapping_reset', f"Mapping for '{selected}' has been removed.")
+            await interaction.response.send_message(embed=embed)
+            
+            await self.cog.log_activity(
+                self.ctx.guild, 
+                "Role Mapping Removed", 
+                f"Mapping for '{selected}' deleted",
+                self.config.get('log_channel_id')
+            )
+        
+        # Drop the commands this guild no longer maps
+        self.cog.sync_guild_commands(self.ctx.guild.id)
+        self.stop()
+
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.grey)
+    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.send_message(embed=self.cog._embeds['reset_cancelled'])
+        self.stop()
+
 class RoleManagement(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.config_dir = 'server_configs'
-        os.makedirs(self.config_dir, exist_ok=True)
+        self._path_tmpl = os.path.join(self.config_dir, '{}.json')
+        self._config_cache = {}  # guild_id -> config, filled once in cog_load
+        self._dirty = set()  # guild ids with changes not yet written to disk
+        self._member_locks = {}  # (guild_id, member_id) -> [lock, holders, role ids we last set]
+        self._registered_dynamic = set()  # command names this cog added to the bot
+        self._owned_commands = {}  # guild_id -> mapping names that guild uses
+        self._command_guilds = {}  # mapping name -> guild ids using it
+        self._help_cache = {}  # guild_id -> rendered rolehelp command list
         self.emojis = {
             'success': '<:sukoon_tick:1322894604898664478>',
             'error': '<:sukoon_cross:1322894630684983307>',
@@ -27,24 +136,167 @@ class RoleManagement(commands.Cog):
             'roles': '<a:sukoon_butterfly:1323990263609298967>',
             'log': '<a:Sukoon_loading:1324070160931356703>'
         }
+        # Titles of per-call embeds, formatted once instead of on every send
+        self._titles = {
+            'activity_log': f"{self.emojis['log']} Activity Log",
+            'permission_denied': f"{self.emojis['error']} Permission Denied",
+            'log_channel_set': f"{self.emojis['success']} Log Channel Set",
+            'required_role_set': f"{self.emojis['roles']} Required Role Set",
+            'mapping_added': f"{self.emojis['success']} Role Mapping Added",
+            'all_mappings_reset': f"{self.emojis['warning']} All Role Mappings Reset",
+            'mapping_reset': f"{self.emojis['warning']} Role Mapping Reset",
+            'reset_prompt': f"{self.emojis['warning']} Reset Role Mappings",
+            'role_error': f"{self.emojis['error']} Role Error",
+            'roles_added': f"{self.emojis['success']} Roles Added",
+            'roles_removed': f"{self.emojis['warning']} Roles Removed",
+            'roles_updated': f"{self.emojis['success']} Roles Updated",
+            'role_management': f"{self.emojis['info']} Role Management"
+        }
+        # Static embeds are built once and reused for every send
+        self._embeds = {
+            'admin_denied': discord.Embed(
+                title=self._titles['permission_denied'], 
+                description="You must be a server administrator to use this command.", 
+                color=ERROR_COLOR
+            ),
+            'self_assign': discord.Embed(
+                title=f"{self.emojis['error']} Role Assignment Error", 
+                description="You cannot assign roles to yourself.", 
+                color=ERROR_COLOR
+            ),
+            'no_valid_roles': discord.Embed(
+                title=self._titles['role_error'], 
+                description="No valid roles found for this mapping", 
+                color=ERROR_COLOR
+            ),
+            'management_disabled': discord.Embed(
+                title=f"{self.emojis['error']} Role Management Disabled", 
+                description="Role management has not been configured for this server.", 
+                color=ERROR_COLOR
+            ),
+            'no_mappings': discord.Embed(
+                title=f"{self.emojis['info']} No Mappings", 
+                description="There are no role mappings to reset.", 
+                color=INFO_COLOR
+            ),
+            'reset_cancelled': discord.Embed(
+                title=f"{self.emojis['error']} Reset Cancelled", 
+                description="Role mapping reset was cancelled.", 
+                color=ERROR_COLOR
+            ),
+            'role_help': self._build_role_help()
+        }
+
+    def _success_embed(self, title_key, description):
+        """Build a success embed using one of the precomputed titles."""
+        return discord.Embed(title=self._titles[title_key], description=description, color=SUCCESS_COLOR)
+
+    def _error_embed(self, title_key, description):
+        """Build an error embed using one of the precomputed titles."""
+        return discord.Embed(title=self._titles[title_key], description=description, color=ERROR_COLOR)
 
     def get_config_path(self, guild_id):
-        return os.path.join(self.config_dir, f'{guild_id}.json')
+        return self._path_tmpl.format(guild_id)
+
+    def _read_all_configs(self):
+        """Read every saved server configuration from disk (runs in a thread)."""
+        os.makedirs(self.config_dir, exist_ok=True)
+        configs = {}
+        with os.scandir(self.config_dir) as entries:
+            for entry in entries:
+                guild_id = entry.name.removesuffix('.json')
+                if guild_id == entry.name or not guild_id.isdigit() or not entry.is_file():
+                    continue
+                try:
+                    with open(entry.path, 'rb') as f:
+                        config = load_config(f.read())
+                    if not isinstance(config, dict):
+                        raise TypeError("top level is not an object")
+                    # Mapped role ids are kept as sets in memory for O(1) dedup
+                    if config.get('role_mappings'):
+                        config['role_mappings'] = {
+                            name: set(role_ids) for name, role_ids in config['role_mappings'].items()
+                        }
+                except (OSError, ValueError, TypeError, AttributeError) as e:
+                    # A bad file only costs its own guild, never the whole cog
+                    logger.error(f"Failed to load config {entry.name}: {e}")
+                    # Move it aside so the guild's next edit cannot overwrite what it held
+                    try:
+                        os.replace(entry.path, f'{entry.path}.bad')
+                    except OSError as e:
+                        logger.error(f"Failed to move aside config {entry.name}: {e}")
+                    continue
+                configs[int(guild_id)] = config
+        return configs
+
+    def _write_config(self, config_path, data):
+        """Atomically replace a config file on disk (runs in a thread)."""
+        tmp_path = f'{config_path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            # Make sure the data is on disk before the rename makes it visible
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, config_path)
+
+    async def cog_load(self):
+        """Load all configs off the event loop and start the flush task."""
+        self._config_cache = await asyncio.to_thread(self._read_all_configs)
+        self.flush_dirty_configs.start()
+
+    async def cog_unload(self):
+        """Stop the flush task, write any pending changes and drop dynamic commands."""
+        # stop() lets a running flush finish; cancel() would drop its unwritten guilds
+        self.flush_dirty_configs.stop()
+        task = self.flush_dirty_configs.get_task()
+        if task is not None and not task.done():
+            # Whether the loop ended cleanly or died, the final flush below must still run
+            await asyncio.wait([task])
+        await self.flush_configs()
+        for custom_name in self._registered_dynamic:
+            self.bot.remove_command(custom_name)
+        self._registered_dynamic.clear()
+        self._owned_commands.clear()
+        self._command_guilds.clear()
 
     def load_configs(self, guild_id):
-        """Load server configurations from JSON."""
-        config_path = self.get_config_path(guild_id)
-        try:
-            with open(config_path, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {}
+        """Load server configurations from the in-memory cache."""
+        # cog_load read every saved file, so a miss means the guild has no config yet
+        return self._config_cache.get(guild_id, {})
 
     def save_configs(self, guild_id, config):
-        """Save server configurations to JSON."""
-        config_path = self.get_config_path(guild_id)
-        with open(config_path, 'w') as f:
-            json.dump(config, f, indent=4)
+        """Update the cached configuration and mark it for writing to JSON."""
+        self._config_cache[guild_id] = config
+        self._dirty.add(guild_id)
+
+    @contextmanager
+    def config_transaction(self, guild_id):
+        """Yield a guild's config for editing and save it once on a clean exit."""
+        config = self.get_server_config(guild_id)
+        yield config
+        self.save_configs(guild_id, config)
+
+    async def flush_configs(self):
+        """Write every changed server configuration to JSON."""
+        dirty, self._dirty = self._dirty, set()
+        try:
+            for guild_id in list(dirty):
+                # Serialize on the loop so the writer thread never sees a dict mid-update
+                data = dump_config(self._config_cache[guild_id])
+                try:
+                    await asyncio.to_thread(self._write_config, self.get_config_path(guild_id), data)
+                except OSError as e:
+                    logger.error(f"Failed to save config for guild {guild_id}: {e}")
+                    continue
+                dirty.discard(guild_id)
+        finally:
+            # Guilds that failed or were never reached (e.g. on cancel) go back for the next flush
+            self._dirty |= dirty
+
+    @tasks.loop(seconds=FLUSH_INTERVAL)
+    async def flush_dirty_configs(self):
+        """Periodically flush changed configs so bursts of edits share one write."""
+        await self.flush_configs()
 
     def get_server_config(self, guild_id):
         """Get or create server configuration."""
@@ -57,20 +309,22 @@ class RoleManagement(commands.Cog):
                 'role_assignment_limit': 5,
                 'admin_only_commands': True
             }
-            self.save_configs(guild_id, config)
+            # Cache the default but leave it off disk until something changes it
+            self._config_cache[guild_id] = config
         return config
 
-    async def log_activity(self, guild, action, details):
+    async def log_activity(self, guild, action, details, log_channel_id=None):
         """Log activities to the designated log channel."""
-        config = self.get_server_config(guild.id)
-        log_channel_id = config.get('log_channel_id')
+        # Callers holding the config pass the channel id to skip the lookup
+        if log_channel_id is None:
+            log_channel_id = self.get_server_config(guild.id).get('log_channel_id')
         
         if log_channel_id:
             try:
                 log_channel = guild.get_channel(log_channel_id)
                 if log_channel:
                     embed = discord.Embed(
-                        title=f"{self.emojis['log']} Activity Log",
+                        title=self._titles['activity_log'],
                         description=f"**Action:** {action}\n**Details:** {details}",
                         color=INFO_COLOR
                     )
@@ -81,39 +335,30 @@ class RoleManagement(commands.Cog):
     async def check_role_permission(self, ctx):
         """
         Check if the user has permission to assign roles.
-        Returns a tuple (is_allowed, error_message)
+        Returns a tuple (is_allowed, error_embed)
         """
-        config = self.get_server_config(ctx.guild.id)
-        req_role_id = config.get('reqrole_id')
-
-        # Admin check
+        # Admin check first; admins never need the config
         if ctx.author.guild_permissions.administrator:
             return True, None
 
-        # Required role check
-        if req_role_id:
-            req_role = ctx.guild.get_role(req_role_id)
-            if req_role in ctx.author.roles:
-                return True, None
-            return False, (
-                f"{self.emojis['error']} Permission Denied", 
-                f"You must have the {req_role.mention} role to manage roles."
-            )
+        config = self.get_server_config(ctx.guild.id)
+        req_role_id = config.get('reqrole_id')
 
         # No specific requirements set
-        return False, (
-            f"{self.emojis['error']} Role Management Disabled", 
-            "Role management has not been configured for this server."
-        )
+        if not req_role_id:
+            return False, self._embeds['management_disabled']
+
+        # Required role check, by id so no Role lookup is needed on success
+        if any(role.id == req_role_id for role in ctx.author.roles):
+            return True, None
+        # Only the error message needs the Role; it may have been deleted since
+        req_role = ctx.guild.get_role(req_role_id)
+        role_text = req_role.mention if req_role else "required"
+        return False, self._error_embed('permission_denied', f"You must have the {role_text} role to manage roles.")
 
     async def admin_only_command(self, ctx):
         """Handle unauthorized admin command attempts."""
-        embed = discord.Embed(
-            title=f"{self.emojis['error']} Permission Denied", 
-            description="You must be a server administrator to use this command.", 
-            color=ERROR_COLOR
-        )
-        await ctx.send(embed=embed)
+        await ctx.send(embed=self._embeds['admin_denied'])
         
         # Log unauthorized access attempt
         await self.log_activity(
@@ -122,299 +367,259 @@ class RoleManagement(commands.Cog):
             f"{ctx.author.name} attempted to use an admin-only command"
         )
 
+    async def cog_command_error(self, ctx, error):
+        """Reply to admin-only commands used without administrator permission."""
+        if isinstance(error, commands.MissingPermissions):
+            await self.admin_only_command(ctx)
+
     @commands.command()
+    @commands.has_permissions(administrator=True)
     async def setlogchannel(self, ctx, channel: discord.TextChannel):
         """Set the log channel for server activities."""
-        if not ctx.author.guild_permissions.administrator:
-            return await self.admin_only_command(ctx)
-        
-        config = self.get_server_config(ctx.guild.id)
-        config['log_channel_id'] = channel.id
-        self.save_configs(ctx.guild.id, config)
+        with self.config_transaction(ctx.guild.id) as config:
+            config['log_channel_id'] = channel.id
         
-        embed = discord.Embed(
-            title=f"{self.emojis['success']} Log Channel Set", 
-            description=f"Logging activities to {channel.mention}", 
-            color=SUCCESS_COLOR
-        )
+        embed = self._success_embed('log_channel_set', f"Logging activities to {channel.mention}")
         await ctx.send(embed=embed)
         
-        await self.log_activity(ctx.guild, "Log Channel Setup", f"Log channel set to {channel.name}")
+        await self.log_activity(ctx.guild, "Log Channel Setup", f"Log channel set to {channel.name}", channel.id)
 
     @commands.command()
+    @commands.has_permissions(administrator=True)
     async def reqrole(self, ctx, role: discord.Role):
         """Set the required role for role management commands."""
-        if not ctx.author.guild_permissions.administrator:
-            return await self.admin_only_command(ctx)
+        with self.config_transaction(ctx.guild.id) as config:
+            config['reqrole_id'] = role.id
         
-        config = self.get_server_config(ctx.guild.id)
-        config['reqrole_id'] = role.id
-        self.save_configs(ctx.guild.id, config)
-        
-        embed = discord.Embed(
-            title=f"{self.emojis['roles']} Required Role Set", 
-            description=f"Only members with {role.mention} can now manage roles.", 
-            color=SUCCESS_COLOR
-        )
+        embed = self._success_embed('required_role_set', f"Only members with {role.mention} can now manage roles.")
         await ctx.send(embed=embed)
         
-        await self.log_activity(ctx.guild, "Required Role Updated", f"New required role: {role.name}")
+        await self.log_activity(ctx.guild, "Required Role Updated", f"New required role: {role.name}", config.get('log_channel_id'))
 
     @commands.command()
+    @commands.has_permissions(administrator=True)
     async def setrole(self, ctx, custom_name: str, role: discord.Role):
         """Map a custom role name to a role."""
-        if not ctx.author.guild_permissions.administrator:
-            return await self.admin_only_command(ctx)
-        
-        config = self.get_server_config(ctx.guild.id)
-        
-        if custom_name not in config['role_mappings']:
-            config['role_mappings'][custom_name] = []
-        
-        if role.id not in config['role_mappings'][custom_name]:
-            config['role_mappings'][custom_name].append(role.id)
-        
-        self.save_configs(ctx.guild.id, config)
+        with self.config_transaction(ctx.guild.id) as config:
+            # Older configs may lack role_mappings; upgrade them in place
+            config.setdefault('role_mappings', {}).setdefault(custom_name, set()).add(role.id)
         
-        embed = discord.Embed(
-            title=f"{self.emojis['success']} Role Mapping Added", 
-            description=f"Mapped '{custom_name}' to {role.mention}", 
-            color=SUCCESS_COLOR
-        )
+        embed = self._success_embed('mapping_added', f"Mapped '{custom_name}' to {role.mention}")
         await ctx.send(embed=embed)
         
-        # Regenerate dynamic commands
-        self.create_dynamic_role_commands()
+        # Register a command only if this mapping name is new
+        self.sync_guild_commands(ctx.guild.id)
         
-        await self.log_activity(ctx.guild, "Role Mapping", f"Mapped '{custom_name}' to {role.name}")
+        await self.log_activity(ctx.guild, "Role Mapping", f"Mapped '{custom_name}' to {role.name}", config.get('log_channel_id'))
 
     @commands.command()
+    @commands.has_permissions(administrator=True)
     async def reset_role(self, ctx):
         """Reset role mappings with interactive options."""
-        if not ctx.author.guild_permissions.administrator:
-            return await self.admin_only_command(ctx)
-        
         config = self.get_server_config(ctx.guild.id)
         role_mappings = config.get('role_mappings', {})
 
-        class ResetRoleView(discord.ui.View):
-            def __init__(self, ctx, cog, role_mappings):
-                super().__init__()
-                self.ctx = ctx
-                self.cog = cog
-                self.role_mappings = role_mappings
-
-                # Populate dropdown with role mapping options
-                self.select_menu.options = [
-                    discord.SelectOption(
-                        label=name, 
-                        description=f"Reset mapping for '{name}'"
-                    ) for name in role_mappings.keys()
-                ]
-                
-                # Add "Reset All" option
-                self.select_menu.options.append(
-                    discord.SelectOption(
-                        label="Reset All Mappings", 
-                        description="Reset ALL role mappings", 
-                        value="_reset_all"
-                    )
-                )
-
-            @discord.ui.select(placeholder="Select Role Mapping to Reset")
-            async def select_menu(self, interaction: discord.Interaction, select: discord.ui.Select):
-                selected = select.values[0]
-                
-                if selected == "_reset_all":
-                    # Reset all mappings
-                    config = self.cog.get_server_config(self.ctx.guild.id)
-                    config['role_mappings'] = {}
-                    self.cog.save_configs(self.ctx.guild.id, config)
-                    
-                    embed = discord.Embed(
-                        title=f"{self.cog.emojis['warning']} All Role Mappings Reset", 
-                        description="All role mappings have been cleared.", 
-                        color=SUCCESS_COLOR
-                    )
-                    await interaction.response.send_message(embed=embed)
-                    
-                    await self.cog.log_activity(
-                        self.ctx.guild, 
-                        "Role Mapping Reset", 
-                        "All role mappings cleared"
-                    )
-                else:
-                    # Reset specific mapping
-                    config = self.cog.get_server_config(self.ctx.guild.id)
-                    del config['role_mappings'][selected]
-                    self.cog.save_configs(self.ctx.guild.id, config)
-                    
-                    embed = discord.Embed(
-                        title=f"{self.cog.emojis['warning']} Role Mapping Reset", 
-                        description=f"Mapping for '{selected}' has been removed.", 
-                        color=SUCCESS_COLOR
-                    )
-                    await interaction.response.send_message(embed=embed)
-                    
-                    await self.cog.log_activity(
-                        self.ctx.guild, 
-                        "Role Mapping Removed", 
-                        f"Mapping for '{selected}' deleted"
-                    )
-                
-                # Regenerate dynamic commands
-                self.cog.create_dynamic_role_commands()
-                self.stop()
-
-            @discord.ui.button(label="Cancel", style=discord.ButtonStyle.grey)
-            async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
-                embed = discord.Embed(
-                    title=f"{self.cog.emojis['error']} Reset Cancelled", 
-                    description="Role mapping reset was cancelled.", 
-                    color=ERROR_COLOR
-                )
-                await interaction.response.send_message(embed=embed)
-                self.stop()
-
         # Check if there are any role mappings
         if not role_mappings:
-            embed = discord.Embed(
-                title=f"{self.emojis['info']} No Mappings", 
-                description="There are no role mappings to reset.", 
-                color=INFO_COLOR
-            )
-            await ctx.send(embed=embed)
+            await ctx.send(embed=self._embeds['no_mappings'])
             return
 
         embed = discord.Embed(
-            title=f"{self.emojis['warning']} Reset Role Mappings", 
+            title=self._titles['reset_prompt'], 
             description="Select a role mapping to reset or choose to reset all mappings.", 
             color=WARNING_COLOR
         )
-        view = ResetRoleView(ctx, self, role_mappings)
+        view = ResetRoleView(ctx, self, config)
         await ctx.send(embed=embed, view=view)
 
     def create_dynamic_role_commands(self):
-        """Dynamically create role commands for each server."""
-        # Remove existing dynamic commands
-        for guild_id in os.listdir(self.config_dir):
-            config = self.load_configs(guild_id.split('.')[0])
-            for custom_name in config.get('role_mappings', {}).keys():
-                if custom_name in self.bot.all_commands:
-                    del self.bot.all_commands[custom_name]
-
-        # Create new dynamic commands
-        for guild_id in os.listdir(self.config_dir):
-            config = self.load_configs(guild_id.split('.')[0])
-            for custom_name in config.get('role_mappings', {}).keys():
-                async def dynamic_role_command(ctx, member: discord.Member, custom_name=custom_name):
-                    # Check if the user is trying to assign role to themselves
-                    if ctx.author == member:
-                        embed = discord.Embed(
-                            title=f"{self.emojis['error']} Role Assignment Error", 
-                            description="You cannot assign roles to yourself.", 
-                            color=ERROR_COLOR
-                        )
-                        await ctx.send(embed=embed)
-                        return
-
-                    # Permission check
-                    is_allowed, error_info = await self.check_role_permission(ctx)
-                    if not is_allowed:
-                        if error_info:
-                            embed = discord.Embed(
-                                title=error_info[0], 
-                                description=error_info[1], 
-                                color=ERROR_COLOR
-                            )
-                            await ctx.send(embed=embed)
-                        return
-
-                    server_config = self.get_server_config(ctx.guild.id)
-                    role_ids = server_config['role_mappings'].get(custom_name, [])
-                    
-                    if not role_ids:
-                        embed = discord.Embed(
-                            title=f"{self.emojis['error']} Role Error", 
-                            description=f"No roles mapped to '{custom_name}'", 
-                            color=ERROR_COLOR
-                        )
-                        await ctx.send(embed=embed)
-                        return
-
-                    roles = [ctx.guild.get_role(role_id) for role_id in role_ids if ctx.guild.get_role(role_id)]
-                    
-                    if not roles:
-                        embed = discord.Embed(
-                            title=f"{self.emojis['error']} Role Error", 
-                            description="No valid roles found for this mapping", 
-                            color=ERROR_COLOR
-                        )
-                        await ctx.send(embed=embed)
-                        return
-
-                    # Modify roles
-                    roles_added = []
-                    roles_removed = []
-                    for role in roles:
-                        if role in member.roles:
-                            await member.remove_roles(role)
-                            roles_removed.append(role)
-                        else:
-                            await member.add_roles(role)
-                            roles_added.append(role)
-
-                    # Send feedback
-                    if roles_added:
-                        embed = discord.Embed(
-                            title=f"{self.emojis['success']} Roles Added", 
-                            description=f"Added to {member.name}: {', '.join(r.name for r in roles_added)}", 
-                            color=SUCCESS_COLOR
-                        )
-                        await ctx.send(embed=embed)
-                    
-                    if roles_removed:
-                        embed = discord.Embed(
-                            title=f"{self.emojis['warning']} Roles Removed", 
-                            description=f"Removed from {member.name}: {', '.join(r.name for r in roles_removed)}", 
-                            color=ERROR_COLOR
-                        )
-                        await ctx.send(embed=embed)
-                        # Log the activity
-                    action_type = "Added" if roles_added else "Removed"
-                    roles_list = roles_added or roles_removed
-                    await self.log_activity(
-                        ctx.guild, 
-                        f"Role {action_type}", 
-                        f"{ctx.author.name} {action_type.lower()} roles for {member.name}: {', '.join(r.name for r in roles_list)}"
-                    )
+        """Sync the dynamic role commands with every server's mappings."""
+        for guild_id in self._config_cache:
+            self.sync_guild_commands(guild_id)
+
+    def sync_guild_commands(self, guild_id):
+        """Register or remove dynamic commands after one guild's mappings change."""
+        self._help_cache.pop(guild_id, None)
+        old_names = self._owned_commands.pop(guild_id, set())
+        mappings = self._config_cache.get(guild_id, {}).get('role_mappings', {})
+        guild = self.bot.get_guild(guild_id)
+        if guild is None:
+            # Guild not in the cache (e.g. the bot has left it); keep every mapping
+            new_names = set(mappings)
+        else:
+            # Mappings whose roles were all deleted get no command
+            new_names = {
+                name for name, role_ids in mappings.items()
+                if any(guild.get_role(role_id) for role_id in role_ids)
+            }
+        if new_names:
+            self._owned_commands[guild_id] = new_names
+
+        # A name stays registered while any guild still maps it
+        for custom_name in old_names - new_names:
+            guild_ids = self._command_guilds[custom_name]
+            guild_ids.discard(guild_id)
+            if not guild_ids:
+                del self._command_guilds[custom_name]
+                if custom_name in self._registered_dynamic:
+                    self.bot.remove_command(custom_name)
+                    self._registered_dynamic.discard(custom_name)
+
+        for custom_name in new_names - old_names:
+            self._command_guilds.setdefault(custom_name, set()).add(guild_id)
+            self._register_command(custom_name)
+
+    def _register_command(self, custom_name):
+        """Register the dynamic role command for a single mapping name."""
+        # Skip names already taken by another guild's mapping or a real command
+        if custom_name in self.bot.all_commands:
+            return
+
+        self.bot.add_command(commands.Command(_mapped_role_command, name=custom_name))
+        self._registered_dynamic.add(custom_name)
+
+    @asynccontextmanager
+    async def member_lock(self, guild_id, member_id):
+        """Serialize role changes for one member and yield its lock entry."""
+        key = (guild_id, member_id)
+        entry = self._member_locks.setdefault(key, [asyncio.Lock(), 0, None])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield entry
+        finally:
+            entry[1] -= 1
+            self._drop_member_lock(key)
+
+    def _drop_member_lock(self, key):
+        """Forget an unused member lock once the member cache has caught up."""
+        entry = self._member_locks.get(key)
+        # Role ids newer than the cache keep the entry alive for the next toggle
+        if entry is not None and not entry[1] and entry[2] is None:
+            del self._member_locks[key]
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before, after):
+        """Drop our role snapshot once the gateway update has reached the cache."""
+        key = (after.guild.id, after.id)
+        entry = self._member_locks.get(key)
+        # roles[0] is @everyone, which the snapshot never contains
+        if entry is not None and entry[2] == {role.id for role in after.roles[1:]}:
+            entry[2] = None
+            self._drop_member_lock(key)
+
+    async def toggle_mapped_roles(self, ctx, member, custom_name):
+        """Toggle the roles mapped to custom_name in this guild on member."""
+        # Check if the user is trying to assign role to themselves
+        if ctx.author == member:
+            await ctx.send(embed=self._embeds['self_assign'])
+            return
+
+        # Permission check
+        is_allowed, error_embed = await self.check_role_permission(ctx)
+        if not is_allowed:
+            if error_embed:
+                await ctx.send(embed=error_embed)
+            return
+
+        server_config = self.get_server_config(ctx.guild.id)
+        role_ids = server_config['role_mappings'].get(custom_name, [])
+        
+        if not role_ids:
+            embed = self._error_embed('role_error', f"No roles mapped to '{custom_name}'")
+            await ctx.send(embed=embed)
+            return
+
+        roles = [role for role in (ctx.guild.get_role(role_id) for role_id in role_ids) if role is not None]
+        
+        if not roles:
+            await ctx.send(embed=self._embeds['no_valid_roles'])
+            return
+
+        async with self.member_lock(ctx.guild.id, member.id) as entry:
+            # member.roles lags until the gateway update arrives, so a toggle
+            # queued behind another one starts from the ids that toggle set
+            if entry[2] is not None:
+                member_role_ids = entry[2]
+            else:
+                member_role_ids = {role.id for role in member.roles[1:]}
+            roles_removed = [role for role in roles if role.id in member_role_ids]
+            roles_added = [role for role in roles if role.id not in member_role_ids]
+            new_role_ids = (member_role_ids - {role.id for role in roles_removed}) | {role.id for role in roles_added}
+            # One PATCH with the full role list instead of a request per role
+            await member.edit(
+                roles=[discord.Object(id=role_id) for role_id in new_role_ids],
+                reason=f"{ctx.author} toggled {custom_name}"
+            )
+            entry[2] = new_role_ids
+
+        # Send feedback as one message, even when roles went both ways
+        added = f"Added to {member.name}: {', '.join(r.name for r in roles_added)}"
+        removed = f"Removed from {member.name}: {', '.join(r.name for r in roles_removed)}"
+        if roles_added and roles_removed:
+            action_type = "Updated"
+            embed = self._success_embed('roles_updated', f"{added}\n{removed}")
+        elif roles_added:
+            action_type = "Added"
+            embed = self._success_embed('roles_added', added)
+        else:
+            action_type = "Removed"
+            embed = self._error_embed('roles_removed', removed)
+        await ctx.send(embed=embed)
 
-                # Dynamically create the command
-                command = commands.command(name=custom_name)(dynamic_role_command)
-                self.bot.add_command(command)
+        # Log the activity with every change the reply listed
+        changes = [text for text, changed in ((added, roles_added), (removed, roles_removed)) if changed]
+        await self.log_activity(
+            ctx.guild, 
+            f"Role {action_type}", 
+            f"{ctx.author.name} changed roles for {member.name}\n" + "\n".join(changes),
+            server_config.get('log_channel_id')
+        )
 
     @commands.Cog.listener()
-    async def on_ready(self):
-        """Create dynamic role commands when bot is ready."""
+    async def on_cogs_loaded(self):
+        """Create dynamic role commands once every extension has registered its own."""
         self.create_dynamic_role_commands()
         logger.info(f'Dynamic role commands created for servers.')
 
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role):
+        """Drop commands whose mapped roles no longer exist."""
+        mappings = self._config_cache.get(role.guild.id, {}).get('role_mappings', {})
+        if any(role.id in role_ids for role_ids in mappings.values()):
+            self.sync_guild_commands(role.guild.id)
+
+    def _build_role_help(self):
+        """Build the static part of the rolehelp embed."""
+        embed = discord.Embed(title=self._titles['role_management'], color=INFO_COLOR)
+        for name, value in ROLE_HELP_FIELDS:
+            embed.add_field(name=name, value=value, inline=False)
+        return embed
+
     @commands.command()
     async def rolehelp(self, ctx):
         """Show role management commands."""
         config = self.get_server_config(ctx.guild.id)
         
-        embed = discord.Embed(title=f"{self.emojis['info']} Role Management", color=INFO_COLOR)
-        embed.add_field(name=".setlogchannel [@channel]", value="Set log channel for bot activities", inline=False)
-        embed.add_field(name=".reqrole [@role]", value="Set required role for role management", inline=False)
-        embed.add_field(name=".setrole [name] [@role]", value="Map a custom role name", inline=False)
-        embed.add_field(name=".reset_role", value="Reset role mappings", inline=False)
-        
-        if config['role_mappings']:
+        # Guilds without mappings get the shared prebuilt embed unchanged
+        if not config['role_mappings']:
+            return await ctx.send(embed=self._embeds['role_help'])
+
+        roles_list = self._help_cache.get(ctx.guild.id)
+        if roles_list is None:
             roles_list = "\n".join(f"- .{name} [@user]" for name in config['role_mappings'].keys())
-            embed.add_field(name="Available Role Commands", value=roles_list, inline=False)
-        
+            self._help_cache[ctx.guild.id] = roles_list
+
+        # Embed.copy() shares the fields list with the template, so deep copy it
+        embed = copy.deepcopy(self._embeds['role_help'])
+        embed.add_field(name="Available Role Commands", value=roles_list, inline=False)
         await ctx.send(embed=embed)
 
+async def _mapped_role_command(ctx, member: discord.Member):
+    """Shared callback for every dynamic role command, keyed by command name."""
+    cog = ctx.bot.get_cog('RoleManagement')
+    if cog is not None:
+        await cog.toggle_mapped_roles(ctx, member, ctx.command.name)
+
 async def setup(bot):
     await bot.add_cog(RoleManagement(bot))
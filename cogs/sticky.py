@@ -2,8 +2,7 @@ import discord
 from discord.ext import commands, tasks
 import asyncio
 import logging
-import os
-from motor.motor_asyncio import AsyncIOMotorClient
+from db import get_motor_client
 from pymongo.errors import PyMongoError
 
 # Set up logging to log only errors
@@ -15,9 +14,8 @@ class StickyBot(commands.Cog):
         self.locks = {}  # Per-channel locks to prevent race conditions
 
         # MongoDB connection setup
-        mongo_uri = os.getenv('MONGO_URL')
         try:
-            self.mongo_client = AsyncIOMotorClient(mongo_uri, serverSelectionTimeoutMS=5000)
+            self.mongo_client = get_motor_client()
             self.mongo_client.server_info()  # Trigger a connection test
             self.db = self.mongo_client['sticky_bot_db']
             self.sticky_collection = self.db['sticky_messages']
@@ -207,7 +205,6 @@ class StickyBot(commands.Cog):
         """Stop the sticky task loop when the bot shuts down."""
         if self.sticky_task.is_running():
             self.sticky_task.cancel()
-        self.mongo_client.close()
 
 # Add the cog to the bot
 async def setup(bot):
@@ -1,7 +1,7 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from pymongo import MongoClient
+from db import get_motor_client
 from datetime import datetime
 import os
 from dotenv import load_dotenv
@@ -18,15 +18,15 @@ class ThreadCreatorCog(commands.Cog):
         if not mongo_uri:
             raise ValueError("MONGO_URL is not set in the environment variables.")
 
-        self.mongo_client = MongoClient(mongo_uri)
+        self.mongo_client = get_motor_client()
         self.db = self.mongo_client["threads"]  # Database name
         self.guild_configs = self.db["guild_configs"]  # Collection for guild configurations
         self.cooldowns = self.db["cooldowns"]  # Collection for cooldown tracking
 
-    def is_on_cooldown(self, guild_id, user_id, cooldown):
+    async def is_on_cooldown(self, guild_id, user_id, cooldown):
         """Check if a user is on cooldown."""
         now = datetime.utcnow()
-        cooldown_entry = self.cooldowns.find_one({"guild_id": guild_id, "user_id": user_id})
+        cooldown_entry = await self.cooldowns.find_one({"guild_id": guild_id, "user_id": user_id})
 
         if cooldown_entry:
             last_used = cooldown_entry["last_used"]
@@ -35,7 +35,7 @@ class ThreadCreatorCog(commands.Cog):
                 return True, cooldown - time_since_last
 
         # Update the cooldown time
-        self.cooldowns.update_one(
+        await self.cooldowns.update_one(
             {"guild_id": guild_id, "user_id": user_id},
             {"$set": {"last_used": now}},
             upsert=True
@@ -49,12 +49,12 @@ class ThreadCreatorCog(commands.Cog):
             return
 
         guild_id, channel_id = str(message.guild.id), str(message.channel.id)
-        config = self.guild_configs.find_one({"guild_id": guild_id, "channel_id": channel_id})
+        config = await self.guild_configs.find_one({"guild_id": guild_id, "channel_id": channel_id})
         if not config or not message.attachments:
             return
 
         cooldown = config.get("cooldown", 30)
-        on_cooldown, remaining = self.is_on_cooldown(guild_id, message.author.id, cooldown)
+        on_cooldown, remaining = await self.is_on_cooldown(guild_id, message.author.id, cooldown)
         if on_cooldown:
             await message.channel.send(f"⏳ Cooldown active. Try again in {remaining:.0f}s.", delete_after=5)
             return
@@ -71,7 +71,7 @@ class ThreadCreatorCog(commands.Cog):
             return
 
         guild_id, channel_id = str(interaction.guild.id), str(channel.id)
-        self.guild_configs.update_one(
+        await self.guild_configs.update_one(
             {"guild_id": guild_id, "channel_id": channel_id},
             {"$set": {"cooldown": cooldown}},
             upsert=True
@@ -83,7 +83,7 @@ class ThreadCreatorCog(commands.Cog):
         """Show all configured channels."""
         guild_id = str(interaction.guild.id)
         config_cursor = self.guild_configs.find({"guild_id": guild_id})
-        configs = list(config_cursor)
+        configs = await config_cursor.to_list(length=None)
 
         if not configs:
             await interaction.response.send_message("❌ No channels configured.", ephemeral=True)
@@ -0,0 +1,20 @@
+import functools
+import os
+from motor.motor_asyncio import AsyncIOMotorClient
+
+@functools.lru_cache(maxsize=1)
+def get_motor_client():
+    """Return the MongoDB client shared by every cog (created on first use)."""
+    return AsyncIOMotorClient(
+        os.getenv("MONGO_URL"),
+        maxPoolSize=20,
+        minPoolSize=2,
+        serverSelectionTimeoutMS=5000,
+        uuidRepresentation="standard",
+    )
+
+def close_motor_client():
+    """Close the shared MongoDB client if it was ever created."""
+    if get_motor_client.cache_info().currsize:
+        get_motor_client().close()
+        get_motor_client.cache_clear()
@@ -4,6 +4,7 @@ import logging
 import os
 from dotenv import load_dotenv
 from keep_alive import keep_alive  # Flask server to keep bot alive if needed
+from db import close_motor_client
 import asyncio
 
 # Load environment variables
@@ -53,6 +54,8 @@ async def load_cogs():
             logging.error(f"{cog} not found. Ensure it is in the correct directory.")
         except commands.errors.ExtensionFailed as e:
             logging.error(f"Failed to load {cog}. Error: {e}")
+    # Cogs that add commands dynamically wait for this so they never take a real command's name
+    bot.dispatch('cogs_loaded')
 
 @bot.event
 async def on_ready():
@@ -85,6 +88,9 @@ async def on_message(message):
 @bot.event
 async def on_command_error(ctx, error):
     """Custom error handling for commands."""
+    # Cogs with their own error handler already answered denied permission checks
+    if isinstance(error, commands.MissingPermissions) and ctx.cog is not None and ctx.cog.has_error_handler():
+        return
     if isinstance(error, commands.CommandNotFound):
         await ctx.send("Command not recognized. Use `.help` to see the available commands.")
         logging.warning(f"Command not found: {ctx.message.content}")
@@ -125,6 +131,7 @@ async def shutdown():
     """Shut down the bot gracefully."""
     print("Shutting down bot...")
     await bot.close()
+    close_motor_client()
 
 import signal
 signal.signal(signal.SIGINT, lambda *_: asyncio.create_task(shutdown()))